@@ -12,26 +12,74 @@ import streamlit as st
 from charts import render_24h_section, render_longterm_section
 from components import render_header, render_latest_summary
 from data_loader import (
+    CACHE_TTL_SECONDS,
     DATA_DIR,
     DEFAULT_METRIC,
     METRICS,
     REFRESH_INTERVAL_SECONDS,
-    aggregate_to_intervals,
+    data_version,
     load_all_data,
+    load_chart_data,
+    slice_time_range,
+)
+from session_memo import (
+    DAILY_CHARTS_KEY,
+    LONGTERM_CHARTS_KEY,
+    clear_session_memos,
+    reuse_for_session,
 )
 from streamlit_autorefresh import st_autorefresh
 
+
+@st.cache_resource
+def _configure_logger() -> logging.Logger:
+    """Configure the app logger once per process instead of on every rerun."""
+    app_logger = logging.getLogger(__name__)
+    if not app_logger.handlers:
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter(
+            "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
+        handler.setFormatter(formatter)
+        app_logger.addHandler(handler)
+        app_logger.setLevel(logging.INFO)
+    return app_logger
+
+
+@st.cache_resource
+def _resolve_settings() -> tuple[dict[str, str], str]:
+    """
+    Build the KPI dropdown options and resolve the default metric.
+
+    Runs once per process, so an invalid DEFAULT_METRIC is logged once rather
+    than on every rerun.
+    """
+    kpi_options = {
+        key: f"{info['name']} ({info['unit']})" for key, info in METRICS.items()
+    }
+
+    # Resolve default metric from env var (validated, case-insensitive)
+    metric_key_map = {key.lower(): key for key in METRICS.keys()}
+    if not DEFAULT_METRIC:
+        default_metric = "download"
+    elif DEFAULT_METRIC in METRICS:
+        default_metric = DEFAULT_METRIC
+    elif DEFAULT_METRIC.lower() in metric_key_map:
+        default_metric = metric_key_map[DEFAULT_METRIC.lower()]
+    else:
+        default_metric = "download"
+        logger.error(
+            "Invalid DEFAULT_METRIC '%s'. Falling back to '%s'. Valid options: %s",
+            DEFAULT_METRIC,
+            default_metric,
+            ", ".join(METRICS.keys()),
+        )
+    return kpi_options, default_metric
+
+
 # Configure app logger
-logger = logging.getLogger(__name__)
-if not logger.handlers:
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter(
-        "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-    logger.setLevel(logging.INFO)
+logger = _configure_logger()
 
 # Number of recent measurements to show
 RECENT_COUNT = 5
@@ -39,25 +87,8 @@ RECENT_COUNT = 5
 # Default date range: past 3 days
 DEFAULT_DATE_RANGE_DAYS = 3
 
-# KPI options for the dropdown
-KPI_OPTIONS = {key: f"{info['name']} ({info['unit']})" for key, info in METRICS.items()}
-
-# Resolve default metric from env var (with validation and case-insensitive matching)
-_metric_key_map = {key.lower(): key for key in METRICS.keys()}
-if not DEFAULT_METRIC:
-    resolved_default_metric = "download"
-elif DEFAULT_METRIC in METRICS:
-    resolved_default_metric = DEFAULT_METRIC
-elif DEFAULT_METRIC.lower() in _metric_key_map:
-    resolved_default_metric = _metric_key_map[DEFAULT_METRIC.lower()]
-else:
-    resolved_default_metric = "download"
-    logger.error(
-        "Invalid DEFAULT_METRIC '%s'. Falling back to '%s'. Valid options: %s",
-        DEFAULT_METRIC,
-        resolved_default_metric,
-        ", ".join(METRICS.keys()),
-    )
+# KPI options for the dropdown and the validated default KPI
+KPI_OPTIONS, resolved_default_metric = _resolve_settings()
 
 # Page configuration
 st.set_page_config(
@@ -113,20 +144,18 @@ DISPLAY_TIMEZONE = ZoneInfo("Europe/Berlin")
 # Main content
 render_header()
 
-# Load data
-with st.spinner("Loading data..."):
-    df_utc = load_all_data()
-
 
 def convert_timezone(df_input):
     """Convert timestamp column to Europe/Berlin timezone."""
     if df_input.empty:
         return df_input
-    df_out = df_input.copy()
     # Ensure timestamp is timezone-aware (UTC), then convert to Berlin time
-    if df_out["timestamp"].dt.tz is None:
-        df_out["timestamp"] = df_out["timestamp"].dt.tz_localize("UTC")
-    df_out["timestamp"] = df_out["timestamp"].dt.tz_convert(DISPLAY_TIMEZONE)
+    timestamps = df_input["timestamp"]
+    if timestamps.dt.tz is None:
+        timestamps = timestamps.dt.tz_localize("UTC")
+    # Shallow copy: other columns share their buffers, only timestamp is replaced
+    df_out = df_input.copy(deep=False)
+    df_out["timestamp"] = timestamps.dt.tz_convert(DISPLAY_TIMEZONE)
     return df_out
 
 
@@ -137,8 +166,24 @@ def as_display_timezone(dt: datetime) -> datetime:
     return dt.astimezone(DISPLAY_TIMEZONE)
 
 
-# Convert to Europe/Berlin timezone for all data
-df = convert_timezone(df_utc)
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_display_data():
+    """Load all measurements converted to the display timezone."""
+    return convert_timezone(load_all_data())
+
+
+@st.cache_data(show_spinner=False)
+def build_csv_bytes(df_input) -> bytes:
+    """Build the CSV export once per data refresh (timestamps in display timezone)."""
+    export_df = df_input.rename(columns={"timestamp": "timestamp_Europe_Berlin"})
+    # Let the CSV writer format datetimes instead of materializing strings first
+    csv_text = export_df.to_csv(index=False, date_format="%Y-%m-%dT%H:%M:%S%z")
+    return csv_text.encode("utf-8")
+
+
+# Load data (converted to Europe/Berlin timezone, cached across reruns)
+with st.spinner("Loading data..."):
+    df = load_display_data()
 
 # Check for stale data (no new measurements in last 2 hours)
 if not df.empty:
@@ -292,10 +337,7 @@ if not df.empty:
     applied_kpi = st.session_state.applied_kpi
 
     # Filter data for charts using applied values
-    chart_df = df[
-        (df["timestamp"] >= chart_start_datetime)
-        & (df["timestamp"] <= chart_end_datetime)
-    ]
+    chart_df = slice_time_range(df, chart_start_datetime, chart_end_datetime)
 
     st.sidebar.caption(
         f"Showing {len(chart_df)} measurements from "
@@ -325,6 +367,7 @@ st.sidebar.caption(
 if st.sidebar.button("Manual Refresh", width="stretch"):
     logger.info("Manual refresh triggered by user")
     st.cache_data.clear()
+    clear_session_memos()
     st.rerun()
 
 # Show data count in sidebar after loading
@@ -336,17 +379,9 @@ if not df.empty:
     st.sidebar.markdown("---")
     st.sidebar.subheader("Export Data")
 
-    @st.cache_data(show_spinner=False)
-    def _build_csv(dataframe) -> str:
-        export_df = dataframe.rename(columns={"timestamp": "timestamp_Europe_Berlin"})
-        export_df["timestamp_Europe_Berlin"] = export_df[
-            "timestamp_Europe_Berlin"
-        ].dt.strftime("%Y-%m-%dT%H:%M:%S%z")
-        return export_df.to_csv(index=False)
-
     st.sidebar.download_button(
         label="📥 Download as CSV",
-        data=_build_csv(df),
+        data=build_csv_bytes(df),
         file_name="speedtest_data.csv",
         mime="text/csv",
         help="Download data as CSV (timestamps in Europe/Berlin timezone)",
@@ -364,7 +399,17 @@ if df.empty:
     st.stop()
 
 # Prepare chart data (always aggregated by measurement run)
-aggregated_chart_df = aggregate_to_intervals(chart_df, interval_minutes=10)
+aggregated_chart_df = load_chart_data(df, chart_start_datetime, chart_end_datetime)
+
+# Identifies the chart inputs; changes with new data or applied controls.
+# aggregated_chart_df is cached on the same data_version(df), so a new
+# fingerprint never rebuilds charts from a stale aggregation.
+chart_fingerprint = (
+    data_version(df),
+    applied_kpi,
+    chart_start_datetime,
+    chart_end_datetime,
+)
 
 # Summary section
 st.markdown("---")
@@ -387,11 +432,15 @@ if aggregated_chart_df.empty:
     st.warning("No data available for the selected date range.")
 else:
     # Render long-term section charts
-    longterm_median_chart, longterm_endpoint_chart = render_longterm_section(
-        df=aggregated_chart_df,
-        metric_key=applied_kpi,
-        metric_name=metric_name,
-        metric_unit=metric_unit,
+    longterm_median_chart, longterm_endpoint_chart = reuse_for_session(
+        LONGTERM_CHARTS_KEY,
+        chart_fingerprint,
+        lambda: render_longterm_section(
+            df=aggregated_chart_df,
+            metric_key=applied_kpi,
+            metric_name=metric_name,
+            metric_unit=metric_unit,
+        ),
     )
 
     # Display in two columns
@@ -447,12 +496,16 @@ if aggregated_chart_df.empty:
     st.warning("No data available for the selected date range.")
 else:
     # Render 24h section charts
-    h24_median_chart, h24_endpoint_chart, missing_hours = render_24h_section(
-        df=aggregated_chart_df,
-        metric_key=applied_kpi,
-        metric_name=metric_name,
-        metric_unit=metric_unit,
-        weekday_filter=weekday_filter,
+    h24_median_chart, h24_endpoint_chart, missing_hours = reuse_for_session(
+        DAILY_CHARTS_KEY,
+        (*chart_fingerprint, tuple(selected_weekdays)),
+        lambda: render_24h_section(
+            df=aggregated_chart_df,
+            metric_key=applied_kpi,
+            metric_name=metric_name,
+            metric_unit=metric_unit,
+            weekday_filter=weekday_filter,
+        ),
     )
 
     # Display in two columns
@@ -1,9 +1,11 @@
 """Chart generation functions using Altair."""
 
+from functools import lru_cache
 from urllib.parse import urlparse
 
 import altair as alt
 import pandas as pd
+import streamlit as st
 
 # Brand color matching netzbremse.de
 BRAND_COLOR = "#e91e63"
@@ -23,10 +25,14 @@ ENDPOINT_PALETTE = [
 ]
 
 
+@lru_cache(maxsize=256)
 def _shorten_endpoint(url: str) -> str:
     """
     Extract short form from endpoint URL.
 
+    Only a handful of distinct endpoints exist, so results are memoized
+    across reruns instead of re-parsing the same URLs for every chart.
+
     Example: https://custom-t0.speed.cloudflare.com --> custom-t0
     """
     try:
@@ -59,8 +65,32 @@ def _build_endpoint_label_map(endpoints: list[str]) -> dict[str, str]:
     return label_map
 
 
+def _label_endpoints(endpoints: pd.Series) -> pd.Series:
+    """
+    Replace endpoint URLs with their display labels as a categorical column.
+
+    Labels are computed per category rather than per row; missing endpoints
+    are shown as "Unknown endpoint". Categories are sorted by label.
+    """
+    endpoints = endpoints.astype("category").cat.remove_unused_categories()
+    label_map = _build_endpoint_label_map(endpoints.cat.categories.tolist())
+    labels = endpoints.cat.rename_categories(label_map)
+    if labels.isna().any():
+        labels = labels.cat.add_categories("Unknown endpoint").fillna(
+            "Unknown endpoint"
+        )
+    # Sorted categories double as the chart's endpoint/legend order
+    return labels.cat.reorder_categories(sorted(labels.cat.categories))
+
+
 def _get_endpoint_color_scale(endpoints: list[str]) -> alt.Scale:
     """Create a color scale for endpoints using magenta nuances."""
+    return _cached_endpoint_color_scale(tuple(endpoints))
+
+
+@lru_cache(maxsize=32)
+def _cached_endpoint_color_scale(endpoints: tuple[str, ...]) -> alt.Scale:
+    """Build the endpoint color scale once per distinct set of endpoints."""
     n_endpoints = len(endpoints)
     if n_endpoints <= len(ENDPOINT_PALETTE):
         colors = ENDPOINT_PALETTE[:n_endpoints]
@@ -69,7 +99,62 @@ def _get_endpoint_color_scale(endpoints: list[str]) -> alt.Scale:
         colors = [
             ENDPOINT_PALETTE[i % len(ENDPOINT_PALETTE)] for i in range(n_endpoints)
         ]
-    return alt.Scale(domain=endpoints, range=colors)
+    return alt.Scale(domain=list(endpoints), range=colors)
+
+
+# Column dtypes of the band statistics sent to the frontend
+_BAND_STATS_DTYPES = {
+    "q25": "float32",
+    "median": "float32",
+    "q75": "float32",
+    "count": "int32",
+}
+
+
+def _present_columns(df: pd.DataFrame, columns: list[str]) -> list[str]:
+    """Return the subset of columns that exist in df, in the given order."""
+    return [col for col in columns if col in df.columns]
+
+
+def _median_band_stats(
+    df: pd.DataFrame, group_key: str, metric_key: str
+) -> pd.DataFrame:
+    """
+    Compute median, 25th/75th percentiles and sample count per group.
+
+    Uses a single grouped quantile call instead of per-group Python lambdas.
+    """
+    grouped = df.groupby(group_key)[metric_key]
+    stats_df = (
+        grouped.quantile([0.25, 0.5, 0.75])
+        .unstack()
+        .rename(columns={0.25: "q25", 0.5: "median", 0.75: "q75"})
+    )
+    stats_df["count"] = grouped.count()
+    stats_df = stats_df.reset_index()
+
+    # Compact dtypes keep the Arrow dataset shipped to the browser small
+    return stats_df.astype(_BAND_STATS_DTYPES)
+
+
+def _frame_fingerprint(df: pd.DataFrame) -> tuple:
+    """
+    Cheap cache key for chart input frames.
+
+    Chart inputs are time-sorted slices of the cached data, so row count,
+    columns, first/last timestamp and per-column sums identify them without
+    hashing every value.
+    """
+    if df.empty:
+        return (0, tuple(df.columns))
+    timestamps = df["timestamp"]
+    return (
+        len(df),
+        tuple(df.columns),
+        timestamps.iloc[0],
+        timestamps.iloc[-1],
+        tuple(df.select_dtypes("number").sum()),
+    )
 
 
 def create_median_band_chart(
@@ -95,16 +180,8 @@ def create_median_band_chart(
             .encode(text=alt.value("No data available"))
         )
 
-    # Group by timestamp and calculate statistics
-    stats_df = (
-        df.groupby("timestamp")
-        .agg(
-            median=(metric_key, "median"),
-            q25=(metric_key, lambda x: x.quantile(0.25)),
-            q75=(metric_key, lambda x: x.quantile(0.75)),
-        )
-        .reset_index()
-    )
+    # Group by timestamp and calculate statistics (count is only shown in 24h)
+    stats_df = _median_band_stats(df, "timestamp", metric_key).drop(columns="count")
 
     # Create band (25th to 75th percentile)
     band = (
@@ -189,13 +266,14 @@ def create_endpoint_lines_chart(
         )
 
     # Group by timestamp and endpoint, then shorten endpoint names
-    grouped_df = df.groupby(["timestamp", "endpoint"])[metric_key].mean().reset_index()
-    endpoint_values = grouped_df["endpoint"].dropna().unique().tolist()
-    endpoint_map = _build_endpoint_label_map(endpoint_values)
-    grouped_df["endpoint"] = grouped_df["endpoint"].map(endpoint_map)
-    grouped_df["endpoint"] = grouped_df["endpoint"].fillna("Unknown endpoint")
+    grouped_df = (
+        df.groupby(["timestamp", "endpoint"], observed=True)[metric_key]
+        .mean()
+        .reset_index()
+    )
+    grouped_df["endpoint"] = _label_endpoints(grouped_df["endpoint"])
 
-    endpoints = sorted(grouped_df["endpoint"].unique().tolist())
+    endpoints = grouped_df["endpoint"].cat.categories.tolist()
     color_scale = _get_endpoint_color_scale(endpoints)
 
     highlight = alt.selection_point(fields=["endpoint"], on="mouseover")
@@ -264,7 +342,9 @@ def create_24h_median_band_chart(
             if isinstance(weekday_filter, str)
             else list(weekday_filter)
         )
-        df = df[df["timestamp"].dt.day_name().isin(weekdays)]
+        # Gather only the columns this chart needs while filtering rows
+        columns = _present_columns(df, ["timestamp", "hour", metric_key])
+        df = df.loc[df["timestamp"].dt.day_name().isin(weekdays), columns]
         if df.empty:
             return (
                 alt.Chart(pd.DataFrame())
@@ -272,20 +352,12 @@ def create_24h_median_band_chart(
                 .encode(text=alt.value("No data available"))
             )
 
-    # Extract hour of day
-    df = df.assign(hour=df["timestamp"].dt.hour)
+    # Extract hour of day unless the caller already did
+    if "hour" not in df.columns:
+        df = df.assign(hour=df["timestamp"].dt.hour)
 
     # Group by hour and calculate statistics
-    stats_df = (
-        df.groupby("hour")
-        .agg(
-            median=(metric_key, "median"),
-            q25=(metric_key, lambda x: x.quantile(0.25)),
-            q75=(metric_key, lambda x: x.quantile(0.75)),
-            count=(metric_key, "count"),
-        )
-        .reset_index()
-    )
+    stats_df = _median_band_stats(df, "hour", metric_key)
 
     # Create band (25th to 75th percentile)
     band = (
@@ -375,7 +447,9 @@ def create_24h_endpoint_lines_chart(
             if isinstance(weekday_filter, str)
             else list(weekday_filter)
         )
-        df = df[df["timestamp"].dt.day_name().isin(weekdays)]
+        # Gather only the columns this chart needs while filtering rows
+        columns = _present_columns(df, ["timestamp", "hour", "endpoint", metric_key])
+        df = df.loc[df["timestamp"].dt.day_name().isin(weekdays), columns]
         if df.empty:
             return (
                 alt.Chart(pd.DataFrame())
@@ -383,17 +457,17 @@ def create_24h_endpoint_lines_chart(
                 .encode(text=alt.value("No data available"))
             )
 
-    # Extract hour of day
-    df = df.assign(hour=df["timestamp"].dt.hour)
+    # Extract hour of day unless the caller already did
+    if "hour" not in df.columns:
+        df = df.assign(hour=df["timestamp"].dt.hour)
 
     # Group by hour and endpoint, then shorten endpoint names
-    grouped_df = df.groupby(["hour", "endpoint"])[metric_key].mean().reset_index()
-    endpoint_values = grouped_df["endpoint"].dropna().unique().tolist()
-    endpoint_map = _build_endpoint_label_map(endpoint_values)
-    grouped_df["endpoint"] = grouped_df["endpoint"].map(endpoint_map)
-    grouped_df["endpoint"] = grouped_df["endpoint"].fillna("Unknown endpoint")
+    grouped_df = (
+        df.groupby(["hour", "endpoint"], observed=True)[metric_key].mean().reset_index()
+    )
+    grouped_df["endpoint"] = _label_endpoints(grouped_df["endpoint"])
 
-    endpoints = sorted(grouped_df["endpoint"].unique().tolist())
+    endpoints = grouped_df["endpoint"].cat.categories.tolist()
     color_scale = _get_endpoint_color_scale(endpoints)
 
     highlight = alt.selection_point(fields=["endpoint"], on="mouseover")
@@ -436,6 +510,11 @@ def create_24h_endpoint_lines_chart(
     )
 
 
+@st.cache_data(
+    max_entries=32,
+    show_spinner=False,
+    hash_funcs={pd.DataFrame: _frame_fingerprint},
+)
 def render_longterm_section(
     df: pd.DataFrame,
     metric_key: str,
@@ -469,6 +548,11 @@ def render_longterm_section(
     return median_chart, endpoint_chart
 
 
+@st.cache_data(
+    max_entries=32,
+    show_spinner=False,
+    hash_funcs={pd.DataFrame: _frame_fingerprint},
+)
 def render_24h_section(
     df: pd.DataFrame,
     metric_key: str,
@@ -482,29 +566,30 @@ def render_24h_section(
     Returns:
         Tuple of (median_band_chart, endpoint_lines_chart, missing_hours)
     """
-    # Calculate missing hours
-    if df.empty:
-        missing_hours = list(range(24))
-    else:
+    if not df.empty:
+        if "hour" not in df.columns:
+            df = df.assign(hour=df["timestamp"].dt.hour)
+        # Filter weekdays once for both charts and the missing-hours check
         if weekday_filter:
             weekdays = (
                 [weekday_filter]
                 if isinstance(weekday_filter, str)
                 else list(weekday_filter)
             )
-            df_view = df[df["timestamp"].dt.day_name().isin(weekdays)]
-        else:
-            df_view = df
-        df_view = df_view.assign(hour=df_view["timestamp"].dt.hour)
-        present_hours = set(df_view["hour"].unique())
-        missing_hours = [h for h in range(24) if h not in present_hours]
+            df = df.loc[
+                df["timestamp"].dt.day_name().isin(weekdays),
+                _present_columns(df, ["timestamp", "hour", "endpoint", metric_key]),
+            ]
+
+    # Calculate missing hours
+    present_hours = df["hour"].unique().tolist() if not df.empty else []
+    missing_hours = sorted(set(range(24)).difference(present_hours))
 
     median_chart = create_24h_median_band_chart(
         df=df,
         metric_key=metric_key,
         metric_name=metric_name,
         metric_unit=metric_unit,
-        weekday_filter=weekday_filter,
         height=350,
     )
 
@@ -513,7 +598,6 @@ def render_24h_section(
         metric_key=metric_key,
         metric_name=metric_name,
         metric_unit=metric_unit,
-        weekday_filter=weekday_filter,
         height=350,
     )
 
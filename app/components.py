@@ -1,7 +1,54 @@
 """Reusable UI components for the dashboard."""
 
+import warnings
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import streamlit as st
+from data_loader import CACHE_TTL_SECONDS, data_version
+from session_memo import LATEST_SUMMARY_KEY, reuse_for_session
+
+# (metric key, label, unit, delta_color) of each summary card, in display
+# order; lower latency and jitter are improvements, hence the inverted color
+_SUMMARY_CARDS = (
+    ("download", "Download", "Mbps", "normal"),
+    ("upload", "Upload", "Mbps", "normal"),
+    ("latency", "Latency", "ms", "inverse"),
+    ("jitter", "Jitter", "ms", "inverse"),
+)
+
+# Metrics averaged for the summary cards, in card order
+SUMMARY_METRICS = tuple(key for key, *_ in _SUMMARY_CARDS)
+
+# Labels and display formats of the per-run measurement table, keyed by the
+# raw column names (so the data needs no renaming) and in display order
+_TABLE_COLUMN_CONFIG = {
+    "timestamp": st.column_config.DatetimeColumn("Time", format="YYYY-MM-DD HH:mm:ss"),
+    "sessionID": st.column_config.Column("Session ID"),
+    "endpoint": st.column_config.Column("Endpoint"),
+    "download": st.column_config.NumberColumn("Download (Mbps)", format="%.2f"),
+    "upload": st.column_config.NumberColumn("Upload (Mbps)", format="%.2f"),
+    "latency": st.column_config.NumberColumn("Latency (ms)", format="%.2f"),
+    "jitter": st.column_config.NumberColumn("Jitter (ms)", format="%.2f"),
+    "downLoadedLatency": st.column_config.NumberColumn(
+        "Loaded Latency Down (ms)", format="%.2f"
+    ),
+    "downLoadedJitter": st.column_config.NumberColumn(
+        "Loaded Jitter Down (ms)", format="%.2f"
+    ),
+    "upLoadedLatency": st.column_config.NumberColumn(
+        "Loaded Latency Up (ms)", format="%.2f"
+    ),
+    "upLoadedJitter": st.column_config.NumberColumn(
+        "Loaded Jitter Up (ms)", format="%.2f"
+    ),
+}
+
+# Columns shown in the table, in display order
+_TABLE_COLUMNS = tuple(_TABLE_COLUMN_CONFIG)
 
 
 def render_header():
@@ -9,95 +56,200 @@ def render_header():
     st.markdown("# Netzbremse Speedtest Dashboard")
 
 
-def render_latest_summary(df: pd.DataFrame, run_size: int = 5):
+def _timestamp_ns(timestamps: pd.Series) -> np.ndarray:
+    """Timestamps as int64 nanoseconds since the epoch (UTC for tz-aware data)."""
+    return timestamps.to_numpy(dtype="datetime64[ns]").view("i8")
+
+
+def _tail_by_timestamp(df: pd.DataFrame, n: int) -> pd.DataFrame:
     """
-    Render summary cards for the latest measurement.
+    Return the n most recent rows of df in timestamp order.
 
-    Shows the average of the last complete test run (typically 5 data points).
+    The log is normally appended in order, so this is usually a plain tail;
+    otherwise only the selected rows are sorted.
     """
-    if df.empty:
-        st.warning("No data available yet.")
-        return
+    n = min(n, len(df))
+    if df["timestamp"].is_monotonic_increasing:
+        return df.iloc[len(df) - n :]
+    ts = _timestamp_ns(df["timestamp"])
+    idx = np.argpartition(ts, len(ts) - n)[len(ts) - n :]
+    return df.take(idx[np.argsort(ts[idx], kind="stable")])
 
-    df_sorted = df.sort_values("timestamp")
-    run_size = min(max(run_size, 1), len(df_sorted))
 
-    latest_run = pd.DataFrame()
-    previous_run = pd.DataFrame()
+def _by_session(df: pd.DataFrame, session_id) -> pd.DataFrame:
+    """Rows of one test run, in timestamp order."""
+    run = df[df["sessionID"] == session_id]
+    if run["timestamp"].is_monotonic_increasing:
+        return run
+    return run.sort_values("timestamp")
 
-    # Prefer true run grouping by sessionID when available
-    if "sessionID" in df_sorted.columns:
-        sessions_df = df_sorted.dropna(subset=["sessionID"])
-        if not sessions_df.empty:
-            session_order = sessions_df["sessionID"].drop_duplicates().tolist()
-            latest_session_id = session_order[-1]
-            latest_run = df_sorted[df_sorted["sessionID"] == latest_session_id]
-            if len(session_order) >= 2:
-                previous_session_id = session_order[-2]
-                previous_run = df_sorted[df_sorted["sessionID"] == previous_session_id]
-
-    # Fallback for datasets without sessionID
-    if latest_run.empty:
-        latest_run = df_sorted.iloc[-run_size:]
-        previous_run = (
-            df_sorted.iloc[-(run_size * 2) : -run_size]
-            if len(df_sorted) >= run_size * 2
-            else pd.DataFrame()
+
+@lru_cache(maxsize=8)
+def _table_columns(columns: tuple) -> tuple:
+    """Table columns present in a frame with the given columns, in display order."""
+    present = set(columns)
+    return tuple(col for col in _TABLE_COLUMNS if col in present)
+
+
+def _metric_means(run: pd.DataFrame) -> np.ndarray:
+    """Mean of each SUMMARY_METRICS column; missing or all-NaN columns give NaN."""
+    # Metrics are loaded as float32, so this extracts them without an upcast
+    values = run.reindex(columns=list(SUMMARY_METRICS)).to_numpy(
+        dtype=np.float32, copy=False
+    )
+    if not np.isnan(values).any():
+        return values.mean(axis=0)
+    with warnings.catch_warnings():
+        # nanmean warns on all-NaN columns, which simply average to NaN here
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return np.nanmean(values, axis=0)
+
+
+def _percent_deltas(
+    latest: np.ndarray, previous: np.ndarray | None
+) -> list[str | None]:
+    """
+    Format the change of each summary metric against the previous run.
+
+    Entries are None when there is no previous run or the change is undefined
+    (missing values or a previous value of zero).
+    """
+    if previous is None:
+        return [None] * len(latest)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = (latest - previous) / previous * 100
+    valid = np.isfinite(percent) & (previous != 0)
+    return [
+        f"{p:+.1f}%" if ok else None for p, ok in zip(percent.tolist(), valid.tolist())
+    ]
+
+
+@dataclass(frozen=True, eq=False)
+class PreparedRun:
+    """Everything render_latest_summary needs about the latest test run."""
+
+    latest: np.ndarray  # SUMMARY_METRICS means of the latest run
+    previous: np.ndarray | None  # same for the previous run, if any
+    deltas: tuple[str | None, ...]  # formatted percent change per metric
+    latest_timestamp: pd.Timestamp
+    latest_table: pa.Table  # table columns of the latest run
+
+
+@st.cache_data(
+    ttl=CACHE_TTL_SECONDS,
+    max_entries=8,
+    show_spinner=False,
+    hash_funcs={pd.DataFrame: data_version},
+)
+def _prepare_latest_run(df: pd.DataFrame, run_size: int) -> PreparedRun:
+    """
+    Select the latest and previous test runs and derive everything shown.
+
+    Cached on data_version(df) and expired with the loader's TTL, so reruns
+    with unchanged data skip run selection, averaging and the Arrow
+    conversion of the run table, and only the display code runs again.
+    """
+    run_size = min(max(run_size, 1), len(df))
+
+    latest_run = None
+    previous_run = None
+
+    # Prefer true run grouping by sessionID when available. Sessions are
+    # ordered by their first timestamp, found with a hash groupby rather than
+    # a sort of the whole log; rows without a sessionID drop out of the groupby.
+    if "sessionID" in df.columns:
+        first_seen = (
+            df["timestamp"].groupby(df["sessionID"], sort=False, observed=True).min()
         )
+        if not first_seen.empty:
+            session_order = first_seen.nlargest(2, keep="last").index[::-1]
+            latest_run = _by_session(df, session_order[-1])
+            if len(session_order) >= 2:
+                previous_run = _by_session(df, session_order[-2])
 
-    latest = latest_run.mean(numeric_only=True)
-    latest_timestamp = latest_run["timestamp"].max()
+    # Fallback for datasets without sessionID: split one tail window
+    if latest_run is None:
+        window = _tail_by_timestamp(df, run_size * 2)
+        if len(window) >= run_size * 2:
+            previous_run, latest_run = window.iloc[:run_size], window.iloc[run_size:]
+        else:
+            latest_run = window.iloc[-run_size:]
+
+    # Convert the run table to Arrow once here rather than on every render
+    available_cols = _table_columns(tuple(latest_run.columns))
+    latest_table = pa.Table.from_pandas(
+        latest_run[list(available_cols)], preserve_index=False
+    )
+
+    # Reduce over the int64 view and box a single Timestamp for the caption
+    timestamps = latest_run["timestamp"]
+    latest_timestamp = pd.Timestamp(
+        _timestamp_ns(timestamps).max(), tz=timestamps.dt.tz
+    )
 
+    latest = _metric_means(latest_run)
     # Previous run for percent difference comparison
-    previous = (
-        previous_run.mean(numeric_only=True) if not previous_run.empty else pd.Series()
+    previous = _metric_means(previous_run) if previous_run is not None else None
+
+    return PreparedRun(
+        latest=latest,
+        previous=previous,
+        deltas=tuple(_percent_deltas(latest, previous)),
+        latest_timestamp=latest_timestamp,
+        latest_table=latest_table,
+    )
+
+
+def _session_prepared_run(df: pd.DataFrame, run_size: int) -> PreparedRun:
+    """Return the PreparedRun from the previous render if the data is unchanged."""
+    return reuse_for_session(
+        LATEST_SUMMARY_KEY,
+        (data_version(df), run_size),
+        lambda: _prepare_latest_run(df, run_size),
+    )
+
+
+def _render_run_table(latest_table: pa.Table):
+    """Render the individual measurements of the latest test run."""
+    st.dataframe(
+        latest_table,
+        width="stretch",
+        hide_index=True,
+        column_config=_TABLE_COLUMN_CONFIG,
     )
 
-    def _percent_diff(metric_key: str) -> str | None:
-        if previous.empty:
-            return None
-        prev_value = previous.get(metric_key)
-        latest_value = latest.get(metric_key)
-        if pd.isna(prev_value) or pd.isna(latest_value) or prev_value == 0:
-            return None
-        percent = (latest_value - prev_value) / prev_value * 100
-        return f"{percent:+.1f}%"
+
+def render_latest_summary(df: pd.DataFrame, run_size: int = 5):
+    """
+    Render summary cards for the latest measurement.
+
+    Shows the average of the last complete test run (typically 5 data points).
+    """
+    if df.empty:
+        st.warning("No data available yet.")
+        return
+
+    run = _session_prepared_run(df, run_size)
 
     st.subheader("Latest Measurement")
     # Format timestamp with timezone name from the timestamp itself
-    tz_name = latest_timestamp.strftime("%Z") if latest_timestamp.tzinfo else ""
+    ts = run.latest_timestamp
+    tz_name = ts.tzname() or ""
     st.caption(
-        f"Recorded at: {latest_timestamp.strftime('%Y-%m-%d %H:%M:%S')} {tz_name}"
+        f"Recorded at: {ts.year:04d}-{ts.month:02d}-{ts.day:02d}"
+        f" {ts.hour:02d}:{ts.minute:02d}:{ts.second:02d} {tz_name}"
         f" (last of the set)"
     )
 
-    col1, col2, col3, col4 = st.columns(4)
-
-    with col1:
-        st.metric(
-            label="Download",
-            value=f"{latest.get('download', 0):.2f} Mbps",
-            delta=_percent_diff("download"),
-        )
-    with col2:
-        st.metric(
-            label="Upload",
-            value=f"{latest.get('upload', 0):.2f} Mbps",
-            delta=_percent_diff("upload"),
-        )
-    with col3:
-        st.metric(
-            label="Latency",
-            value=f"{latest.get('latency', 0):.2f} ms",
-            delta=_percent_diff("latency"),
-            delta_color="inverse",
-        )
-    with col4:
-        st.metric(
-            label="Jitter",
-            value=f"{latest.get('jitter', 0):.2f} ms",
-            delta=_percent_diff("jitter"),
-            delta_color="inverse",
+    columns = st.columns(len(SUMMARY_METRICS))
+    for column, (_, label, unit, delta_color), value, delta in zip(
+        columns, _SUMMARY_CARDS, run.latest, run.deltas
+    ):
+        column.metric(
+            label=label,
+            value=f"{value:.2f} {unit}",
+            delta=delta,
+            delta_color=delta_color,
         )
 
     st.caption(
@@ -106,50 +258,10 @@ def render_latest_summary(df: pd.DataFrame, run_size: int = 5):
         " Percent differences compare against the previous test run when available."
     )
 
-    # Show last 5 measurements in an accordion
-    with st.expander("View individual measurements from this test run"):
-        last_5_df = latest_run.copy()
-        last_5_df["timestamp"] = last_5_df["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S")
-
-        # Select all available columns
-        all_columns = [
-            "timestamp",
-            "sessionID",
-            "endpoint",
-            "download",
-            "upload",
-            "latency",
-            "jitter",
-            "downLoadedLatency",
-            "downLoadedJitter",
-            "upLoadedLatency",
-            "upLoadedJitter",
-        ]
-        available_cols = [col for col in all_columns if col in last_5_df.columns]
-        display_df = last_5_df[available_cols].copy()
-
-        column_rename = {
-            "timestamp": "Time",
-            "sessionID": "Session ID",
-            "endpoint": "Endpoint",
-            "download": "Download (Mbps)",
-            "upload": "Upload (Mbps)",
-            "latency": "Latency (ms)",
-            "jitter": "Jitter (ms)",
-            "downLoadedLatency": "Loaded Latency Down (ms)",
-            "downLoadedJitter": "Loaded Jitter Down (ms)",
-            "upLoadedLatency": "Loaded Latency Up (ms)",
-            "upLoadedJitter": "Loaded Jitter Up (ms)",
-        }
-        display_df = display_df.rename(columns=column_rename)
-
-        # Format numeric columns
-        numeric_cols = [
-            col
-            for col in display_df.columns
-            if col not in ["Time", "Session ID", "Endpoint"]
-        ]
-        for col in numeric_cols:
-            display_df[col] = display_df[col].apply(lambda x: f"{x:.2f}")
-
-        st.dataframe(display_df, width="stretch", hide_index=True)
+    # The run table is only built and sent when asked for; a collapsed
+    # expander would still run its body on every rerun
+    if st.toggle(
+        "View individual measurements from this test run",
+        key="show_latest_run_table",
+    ):
+        _render_run_table(run.latest_table)
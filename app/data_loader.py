@@ -60,6 +60,8 @@ def _parse_refresh_interval_seconds(default_value: int = 3600) -> int:
 
 
 REFRESH_INTERVAL_SECONDS = _parse_refresh_interval_seconds()
+# Expire cached data slightly before the next auto-refresh
+CACHE_TTL_SECONDS = max(REFRESH_INTERVAL_SECONDS - 5, 5)
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
 DEFAULT_METRIC = os.environ.get("DEFAULT_METRIC")
 
@@ -247,6 +249,38 @@ def _load_json_files_parallel(filepaths: list[Path]) -> list[dict]:
     return records
 
 
+# String columns with few distinct values relative to the row count
+_CATEGORICAL_COLUMNS = ("endpoint", "sessionID")
+
+
+def _optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Narrow column dtypes to reduce memory and bytes moved per operation.
+
+    Metrics are stored as float32 (Mbps/ms need no float64 precision) and the
+    repeated endpoint URLs and session IDs as categorical columns.
+    """
+    dtypes = {
+        col: "float32"
+        for col in METRICS
+        if col in df.columns and df[col].dtype != "float32"
+    }
+    for col in _CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            dtypes[col] = "category"
+    if not dtypes:
+        return df
+
+    df = df.copy(deep=False)
+    for col, dtype in dtypes.items():
+        if dtype == "float32":
+            # Unparseable values become NaN instead of failing the cast
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
 def _load_cache(cache_path: Path) -> Optional[pd.DataFrame]:
     """Load data from Parquet cache file if it exists."""
     if not cache_path.exists():
@@ -286,7 +320,7 @@ def _save_cache(df: pd.DataFrame, cache_path: Path) -> None:
         logger.error("Cache save failed (non-fatal): %s", e)
 
 
-@st.cache_data(ttl=max(REFRESH_INTERVAL_SECONDS - 5, 5))
+@st.cache_data(ttl=CACHE_TTL_SECONDS)
 def load_all_data() -> pd.DataFrame:
     """
     Load speedtest data with Parquet caching for fast startup.
@@ -361,9 +395,12 @@ def load_all_data() -> pd.DataFrame:
             logger.info(
                 "Cache is current, no new files to load (total: %.1f ms)", elapsed_ms
             )
-            return cached_df.drop(columns=["source_file"], errors="ignore").sort_values(
-                "timestamp", ascending=True
-            )
+            # The cache is written sorted with narrowed dtypes, so these are
+            # normally no-ops (older cache files are converted on the fly)
+            result_df = cached_df.drop(columns=["source_file"], errors="ignore")
+            if not result_df["timestamp"].is_monotonic_increasing:
+                result_df = result_df.sort_values("timestamp", ascending=True)
+            return _optimize_dtypes(result_df)
 
         logger.info(
             "Cache delta: %d new, %d changed, %d deleted (%d cached)",
@@ -410,8 +447,8 @@ def load_all_data() -> pd.DataFrame:
 
         df = pd.DataFrame(records)
 
-    # Sort and save updated cache
-    df = df.sort_values("timestamp", ascending=True)
+    # Sort and save updated cache with narrowed dtypes
+    df = _optimize_dtypes(df.sort_values("timestamp", ascending=True))
     _save_cache(df, cache_path)
 
     elapsed_ms = (time.perf_counter() - overall_start) * 1000
@@ -423,6 +460,24 @@ def load_all_data() -> pd.DataFrame:
     return df.drop(columns=["source_file"], errors="ignore")
 
 
+def data_version(df: pd.DataFrame) -> tuple:
+    """
+    Cheap identifier of the loaded data for cache and session keys.
+
+    Row count and time bounds change when files are added or removed, and the
+    source mtime checksum changes when a file is rewritten in place (the
+    changed-file path of load_all_data), without hashing every value.
+    """
+    if df.empty:
+        return (0,)
+    timestamps = df["timestamp"]
+    version = (len(df), timestamps.iloc[0], timestamps.iloc[-1])
+    if "source_mtime_ns" in df.columns:
+        # Wrapping int64 sum; it only has to change when any file's mtime does
+        version += (int(df["source_mtime_ns"].sum()),)
+    return version
+
+
 def get_latest_measurements(df: pd.DataFrame, count: int = 5) -> pd.DataFrame:
     """Return the most recent N measurements (most recent first)."""
     if df.empty:
@@ -430,6 +485,26 @@ def get_latest_measurements(df: pd.DataFrame, count: int = 5) -> pd.DataFrame:
     return df.tail(count).iloc[::-1]
 
 
+def slice_time_range(df: pd.DataFrame, start: datetime, end: datetime) -> pd.DataFrame:
+    """
+    Return measurements with start <= timestamp <= end.
+
+    Data from load_all_data() is already sorted by timestamp, so the bounds are
+    found by binary search and returned as a positional slice instead of
+    building boolean masks over the whole frame.
+    """
+    if df.empty:
+        return df
+
+    if not df["timestamp"].is_monotonic_increasing:
+        df = df.sort_values("timestamp", ascending=True)
+
+    timestamps = df["timestamp"]
+    lower = timestamps.searchsorted(start, side="left")
+    upper = timestamps.searchsorted(end, side="right")
+    return df.iloc[lower:upper]
+
+
 def aggregate_to_intervals(
     df: pd.DataFrame, interval_minutes: int = 10
 ) -> pd.DataFrame:
@@ -453,7 +528,7 @@ def aggregate_to_intervals(
         # Group by both interval and endpoint to preserve endpoint info
         agg_dict = {col: "mean" for col in metric_cols}
         agg_df = (
-            df.groupby(["interval", "endpoint"], dropna=False)
+            df.groupby(["interval", "endpoint"], dropna=False, observed=True)
             .agg(agg_dict)
             .reset_index()
         )
@@ -474,3 +549,24 @@ def aggregate_to_intervals(
     )
 
     return agg_df.sort_values("timestamp", ascending=True)
+
+
+@st.cache_data(
+    ttl=CACHE_TTL_SECONDS,
+    show_spinner=False,
+    hash_funcs={pd.DataFrame: data_version},
+)
+def load_chart_data(df: pd.DataFrame, start: datetime, end: datetime) -> pd.DataFrame:
+    """
+    Aggregate measurements between start and end into 10-minute intervals.
+
+    Keyed on data_version(df) as well as the range, so a rewritten or
+    backfilled file inside the range invalidates the aggregation together
+    with the data it came from instead of on a separate TTL clock.
+    """
+    range_df = slice_time_range(df, start, end)
+    aggregated_df = aggregate_to_intervals(range_df, interval_minutes=10)
+    if aggregated_df.empty:
+        return aggregated_df
+    # Hour of day is shared by all 24h charts, so derive it once per range
+    return aggregated_df.assign(hour=aggregated_df["timestamp"].dt.hour)
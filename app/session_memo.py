@@ -0,0 +1,32 @@
+"""Per-session reuse of derived results across Streamlit reruns."""
+
+import streamlit as st
+
+# Session state keys of the memoized results
+LONGTERM_CHARTS_KEY = "_longterm_charts"
+DAILY_CHARTS_KEY = "_24h_charts"
+LATEST_SUMMARY_KEY = "_latest_summary"
+
+SESSION_MEMO_KEYS = (LONGTERM_CHARTS_KEY, DAILY_CHARTS_KEY, LATEST_SUMMARY_KEY)
+
+
+def reuse_for_session(key: str, fingerprint: tuple, build):
+    """
+    Return the result stored under key if it was built for fingerprint.
+
+    Otherwise call build() and store its result. Most reruns come from widget
+    interaction with unchanged inputs, and this skips even the st.cache_data
+    lookup, which hashes its key and unpickles the stored result every time.
+    """
+    stored = st.session_state.get(key)
+    if stored is not None and stored[0] == fingerprint:
+        return stored[1]
+    result = build()
+    st.session_state[key] = (fingerprint, result)
+    return result
+
+
+def clear_session_memos():
+    """Drop every memoized result of the current session."""
+    for key in SESSION_MEMO_KEYS:
+        st.session_state.pop(key, None)
@@ -4,17 +4,66 @@ import sys
 from types import ModuleType
 from unittest.mock import MagicMock
 
+import pytest
+
+
 # Build a minimal streamlit stub so app modules can be imported without a
 # running Streamlit server.  The decorator @st.cache_data must be transparent
 # (i.e. return the function unchanged) for tests to call the real function.
+# Its options are kept on the function as `cache_options` so tests can check
+# how results would be keyed.
+def _cache_data(*args, **kwargs):
+    def decorate(fn):
+        fn.cache_options = kwargs
+        return fn
+
+    # handle @st.cache_data and @st.cache_data(ttl=…)
+    return decorate(args[0]) if args else decorate
+
+
 _st_stub = ModuleType("streamlit")
-_st_stub.cache_data = lambda *args, **kwargs: (
-    (lambda fn: fn)
-    if not args
-    else args[0]  # handle @st.cache_data and @st.cache_data(ttl=…)
-)
+_st_stub.cache_data = _cache_data
 _st_stub.warning = MagicMock()
 _st_stub.error = MagicMock()
 _st_stub.info = MagicMock()
+_st_stub.column_config = MagicMock()
 
 sys.modules.setdefault("streamlit", _st_stub)
+
+# The app modules import their siblings as top-level modules (e.g.
+# `from data_loader import ...`), as they do under `streamlit run app/app.py`.
+# `app` is a namespace package, so putting app/ on sys.path would make
+# `import app` pick up app/app.py; alias the sibling module instead so both
+# names refer to the same module object.
+import app.data_loader
+import app.session_memo
+
+sys.modules.setdefault("data_loader", app.data_loader)
+sys.modules.setdefault("session_memo", app.session_memo)
+
+
+@pytest.fixture
+def cache_data_memo():
+    """
+    Wrap an @st.cache_data function in a memo keyed like Streamlit keys it.
+
+    Arguments are hashed with the function's declared hash_funcs (or used as
+    is), so tests can tell whether a change reaches the cache key.
+    """
+
+    def wrap(fn):
+        hash_funcs = fn.cache_options.get("hash_funcs", {})
+        results = {}
+
+        def cached(*args):
+            key = tuple(
+                hash_funcs[type(arg)](arg) if type(arg) in hash_funcs else arg
+                for arg in args
+            )
+            if key not in results:
+                results[key] = fn(*args)
+            return results[key]
+
+        return cached
+
+    return wrap
@@ -1,15 +1,21 @@
 """Unit tests for app/charts.py."""
 
 import pandas as pd
+import pytest
 
 # conftest.py stubs streamlit before this import
 from app.charts import (
     ENDPOINT_PALETTE,
     _build_endpoint_label_map,
+    _frame_fingerprint,
     _get_endpoint_color_scale,
+    _label_endpoints,
+    _median_band_stats,
     _shorten_endpoint,
+    create_24h_median_band_chart,
     create_endpoint_lines_chart,
     create_median_band_chart,
+    render_24h_section,
 )
 
 # ---------------------------------------------------------------------------
@@ -87,6 +93,44 @@ class TestBuildEndpointLabelMap:
         assert label_map["https://alpha.x.com"] == "alpha"
 
 
+# ---------------------------------------------------------------------------
+# _label_endpoints
+# ---------------------------------------------------------------------------
+
+
+class TestLabelEndpoints:
+    def test_maps_urls_to_short_labels(self):
+        endpoints = pd.Series(
+            ["https://alpha.x.com", "https://beta.x.com", "https://alpha.x.com"]
+        )
+        labels = _label_endpoints(endpoints)
+        assert list(labels) == ["alpha", "beta", "alpha"]
+
+    def test_drops_unused_categories(self):
+        endpoints = pd.Series(
+            pd.Categorical(
+                ["https://alpha.x.com"],
+                categories=["https://alpha.x.com", "https://gamma.x.com"],
+            )
+        )
+        labels = _label_endpoints(endpoints)
+        assert list(labels.cat.categories) == ["alpha"]
+
+    def test_categories_sorted_by_label(self):
+        urls = ["https://zeta.x.com", "https://alpha.x.com"]
+        endpoints = pd.Series(pd.Categorical(urls, categories=urls))
+        labels = _label_endpoints(endpoints)
+        assert list(labels.cat.categories) == ["alpha", "zeta"]
+        assert list(labels) == ["zeta", "alpha"]
+
+    def test_missing_endpoint_labelled_unknown(self):
+        endpoints = pd.Series(
+            pd.Categorical(["https://alpha.x.com", None], categories=None)
+        )
+        labels = _label_endpoints(endpoints)
+        assert list(labels) == ["alpha", "Unknown endpoint"]
+
+
 # ---------------------------------------------------------------------------
 # _get_endpoint_color_scale
 # ---------------------------------------------------------------------------
@@ -110,12 +154,56 @@ class TestGetEndpointColorScale:
         # First color of the overflow should match the first palette entry
         assert scale.range[len(ENDPOINT_PALETTE)] == ENDPOINT_PALETTE[0]
 
+    def test_same_endpoints_reuse_scale(self):
+        first = _get_endpoint_color_scale(["ep-x", "ep-y"])
+        assert _get_endpoint_color_scale(["ep-x", "ep-y"]) is first
+        assert _get_endpoint_color_scale(["ep-y", "ep-x"]) is not first
+
     def test_domain_matches_endpoints(self):
         endpoints = ["ep-x", "ep-y"]
         scale = _get_endpoint_color_scale(endpoints)
         assert scale.domain == endpoints
 
 
+# ---------------------------------------------------------------------------
+# _median_band_stats
+# ---------------------------------------------------------------------------
+
+
+class TestMedianBandStats:
+    def test_matches_per_group_quantiles(self):
+        df = pd.DataFrame(
+            {
+                "hour": [0, 0, 0, 0, 1, 1],
+                "download": [10.0, 20.0, 30.0, 40.0, 5.0, 7.0],
+            }
+        )
+        stats = _median_band_stats(df, "hour", "download")
+        row = stats[stats["hour"] == 0].iloc[0]
+        assert row["median"] == pytest.approx(25.0)
+        assert row["q25"] == pytest.approx(17.5)
+        assert row["q75"] == pytest.approx(32.5)
+        assert row["count"] == 4
+
+    def test_count_ignores_missing_values(self):
+        df = pd.DataFrame({"hour": [3, 3, 3], "download": [1.0, None, 3.0]})
+        stats = _median_band_stats(df, "hour", "download")
+        assert stats["count"].iloc[0] == 2
+        assert stats["median"].iloc[0] == pytest.approx(2.0)
+
+    def test_one_row_per_group(self):
+        df = pd.DataFrame({"hour": [0, 1, 1, 2], "download": [1.0, 2.0, 3.0, 4.0]})
+        stats = _median_band_stats(df, "hour", "download")
+        assert len(stats) == 3
+        assert list(stats.columns) == ["hour", "q25", "median", "q75", "count"]
+
+    def test_uses_compact_dtypes(self):
+        df = pd.DataFrame({"hour": [0, 0, 1], "download": [1.0, 2.0, 3.0]})
+        stats = _median_band_stats(df, "hour", "download")
+        assert stats["median"].dtype == "float32"
+        assert stats["count"].dtype == "int32"
+
+
 # ---------------------------------------------------------------------------
 # create_median_band_chart
 # ---------------------------------------------------------------------------
@@ -185,3 +273,81 @@ class TestCreateEndpointLinesChart:
         df = _make_chart_df()  # no endpoint column
         chart = create_endpoint_lines_chart(df, "download", "Download", "Mbps")
         assert isinstance(chart, alt.Chart)
+
+
+# ---------------------------------------------------------------------------
+# create_24h_median_band_chart
+# ---------------------------------------------------------------------------
+
+
+class TestCreate24hMedianBandChart:
+    def test_groups_by_hour_of_day(self):
+        df = _make_chart_df(48)
+        chart = create_24h_median_band_chart(df, "download", "Download", "Mbps")
+        stats = chart.data
+        assert list(stats["hour"]) == list(range(24))
+        assert (stats["count"] == 2).all()
+
+    def test_weekday_filter_keeps_matching_days_only(self):
+        # 2024-01-01 is a Monday; 48 hourly rows cover Monday and Tuesday
+        df = _make_chart_df(48).assign(upload=1.0, endpoint="https://a.example.com")
+        chart = create_24h_median_band_chart(
+            df, "download", "Download", "Mbps", weekday_filter=["Tuesday"]
+        )
+        assert (chart.data["count"] == 1).all()
+        assert chart.data["median"].iloc[0] == pytest.approx(74.0)
+
+    def test_uses_precomputed_hour_column(self):
+        df = _make_chart_df(4).assign(hour=[5, 5, 6, 6])
+        chart = create_24h_median_band_chart(df, "download", "Download", "Mbps")
+        assert list(chart.data["hour"]) == [5, 6]
+
+
+# ---------------------------------------------------------------------------
+# _frame_fingerprint
+# ---------------------------------------------------------------------------
+
+
+class TestFrameFingerprint:
+    def test_identical_frames_match(self):
+        assert _frame_fingerprint(_make_chart_df()) == _frame_fingerprint(
+            _make_chart_df()
+        )
+
+    def test_changed_values_differ(self):
+        df = _make_chart_df()
+        changed = df.assign(download=df["download"] + 1)
+        assert _frame_fingerprint(df) != _frame_fingerprint(changed)
+
+    def test_different_range_differs(self):
+        df = _make_chart_df()
+        assert _frame_fingerprint(df) != _frame_fingerprint(df.iloc[1:])
+
+    def test_empty_frame(self):
+        assert _frame_fingerprint(pd.DataFrame()) == (0, ())
+
+
+# ---------------------------------------------------------------------------
+# render_24h_section
+# ---------------------------------------------------------------------------
+
+
+class TestRender24hSection:
+    def test_reports_missing_hours(self):
+        df = _make_endpoint_df(6)  # hours 0-5 on a single day
+        _, _, missing_hours = render_24h_section(df, "download", "Download", "Mbps")
+        assert missing_hours == list(range(6, 24))
+
+    def test_missing_hours_respect_weekday_filter(self):
+        # 2024-01-01 is a Monday; 30 hourly rows reach into Tuesday 05:00
+        df = _make_endpoint_df(30)
+        _, _, missing_hours = render_24h_section(
+            df, "download", "Download", "Mbps", weekday_filter="Tuesday"
+        )
+        assert missing_hours == list(range(6, 24))
+
+    def test_empty_df_misses_all_hours(self):
+        _, _, missing_hours = render_24h_section(
+            pd.DataFrame(), "download", "Download", "Mbps"
+        )
+        assert missing_hours == list(range(24))
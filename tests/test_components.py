@@ -0,0 +1,246 @@
+"""Unit tests for app/components.py."""
+
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# conftest.py stubs streamlit before this import
+from app.components import (
+    SUMMARY_METRICS,
+    _metric_means,
+    _percent_deltas,
+    _prepare_latest_run,
+    _session_prepared_run,
+    _table_columns,
+    _tail_by_timestamp,
+)
+
+
+def _make_runs_df(sessions: int = 3, run_size: int = 5) -> pd.DataFrame:
+    n = sessions * run_size
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=n, freq="1min", tz="UTC"),
+            "sessionID": [f"s{i // run_size}" for i in range(n)],
+            "download": [float(i // run_size + 1) * 100 for i in range(n)],
+            "latency": [float(i // run_size + 1) * 10 for i in range(n)],
+        }
+    )
+
+
+# ---------------------------------------------------------------------------
+# _tail_by_timestamp
+# ---------------------------------------------------------------------------
+
+
+class TestTailByTimestamp:
+    def test_sorted_input_returns_tail(self):
+        df = _make_runs_df()
+        result = _tail_by_timestamp(df, 4)
+        pd.testing.assert_frame_equal(result, df.iloc[-4:])
+
+    def test_unsorted_input_returns_latest_rows_in_order(self):
+        df = _make_runs_df().sample(frac=1, random_state=0)
+        result = _tail_by_timestamp(df, 4)
+        expected = df.sort_values("timestamp").iloc[-4:]
+        assert result["timestamp"].tolist() == expected["timestamp"].tolist()
+
+    def test_n_larger_than_frame(self):
+        df = _make_runs_df(sessions=1).iloc[::-1]
+        result = _tail_by_timestamp(df, 50)
+        assert len(result) == len(df)
+        assert result["timestamp"].is_monotonic_increasing
+
+
+# ---------------------------------------------------------------------------
+# _table_columns
+# ---------------------------------------------------------------------------
+
+
+class TestTableColumns:
+    def test_keeps_display_order_and_drops_unknown(self):
+        columns = ("download", "source_file", "timestamp", "endpoint")
+        assert _table_columns(columns) == ("timestamp", "endpoint", "download")
+
+    def test_no_known_columns(self):
+        assert _table_columns(("foo", "bar")) == ()
+
+
+# ---------------------------------------------------------------------------
+# _metric_means
+# ---------------------------------------------------------------------------
+
+
+class TestMetricMeans:
+    def test_returns_means_in_summary_order(self):
+        run = pd.DataFrame(
+            {
+                "jitter": [1.0, 3.0],
+                "download": [100.0, 200.0],
+                "upload": [10.0, 20.0],
+                "latency": [5.0, 7.0],
+            }
+        )
+        means = _metric_means(run)
+        assert len(means) == len(SUMMARY_METRICS)
+        assert means.tolist() == [150.0, 15.0, 6.0, 2.0]
+
+    def test_summary_metrics_follow_card_order(self):
+        assert SUMMARY_METRICS == ("download", "upload", "latency", "jitter")
+
+    def test_missing_column_is_nan(self):
+        means = _metric_means(pd.DataFrame({"download": [1.0, 3.0]}))
+        assert means[0] == 2.0
+        assert np.isnan(means[1:]).all()
+
+    def test_reduces_in_float32(self):
+        means = _metric_means(pd.DataFrame({"download": [1.0, 2.0]}, dtype="float32"))
+        assert means.dtype == np.float32
+
+    def test_nan_values_are_skipped(self):
+        means = _metric_means(pd.DataFrame({"download": [1.0, np.nan, 3.0]}))
+        assert means[0] == 2.0
+
+
+# ---------------------------------------------------------------------------
+# _percent_deltas
+# ---------------------------------------------------------------------------
+
+
+class TestPercentDeltas:
+    def test_formats_signed_percentages(self):
+        deltas = _percent_deltas(np.array([110.0, 45.0]), np.array([100.0, 50.0]))
+        assert deltas == ["+10.0%", "-10.0%"]
+
+    def test_no_previous_run(self):
+        assert _percent_deltas(np.array([1.0, 2.0]), None) == [None, None]
+
+    def test_undefined_changes_are_none(self):
+        deltas = _percent_deltas(
+            np.array([5.0, np.nan, 0.0, 3.0]), np.array([0.0, 1.0, 0.0, np.nan])
+        )
+        assert deltas == [None, None, None, None]
+
+
+# ---------------------------------------------------------------------------
+# _prepare_latest_run
+# ---------------------------------------------------------------------------
+
+
+class TestPrepareLatestRun:
+    def test_groups_by_session_id(self):
+        run = _prepare_latest_run(_make_runs_df(), 5)
+        assert run.latest[0] == 300.0
+        assert run.previous[0] == 200.0
+        assert run.latest_table.num_rows == 5
+        assert set(run.latest_table.column("sessionID").to_pylist()) == {"s2"}
+
+    def test_latest_timestamp_is_last_of_run(self):
+        df = _make_runs_df()
+        run = _prepare_latest_run(df, 5)
+        assert run.latest_timestamp == df["timestamp"].iloc[-1]
+
+    def test_latest_timestamp_keeps_display_timezone(self):
+        df = _make_runs_df()
+        df["timestamp"] = df["timestamp"].dt.tz_convert("Europe/Berlin")
+        run = _prepare_latest_run(df, 5)
+        assert run.latest_timestamp == df["timestamp"].iloc[-1]
+        assert run.latest_timestamp.tzname() == "CET"
+
+    def test_latest_timestamp_naive(self):
+        df = _make_runs_df()
+        df["timestamp"] = df["timestamp"].dt.tz_localize(None)
+        run = _prepare_latest_run(df, 5)
+        assert run.latest_timestamp == df["timestamp"].iloc[-1]
+        assert run.latest_timestamp.tzinfo is None
+
+    def test_unsorted_input_is_ordered_by_timestamp(self):
+        df = _make_runs_df().iloc[::-1]
+        run = _prepare_latest_run(df, 5)
+        assert run.latest[0] == 300.0
+        assert run.previous[0] == 200.0
+
+    def test_shuffled_input_keeps_session_grouping(self):
+        df = _make_runs_df().sample(frac=1, random_state=1)
+        run = _prepare_latest_run(df, 5)
+        assert run.latest[0] == 300.0
+        timestamps = run.latest_table.column("timestamp").to_pandas()
+        assert timestamps.is_monotonic_increasing
+
+    def test_table_keeps_known_columns_in_display_order(self):
+        df = _make_runs_df()
+        df["extra"] = 1
+        run = _prepare_latest_run(df[["latency", "timestamp", "extra"]], 5)
+        assert run.latest_table.column_names == ["timestamp", "latency"]
+
+    def test_fallback_without_session_id(self):
+        df = _make_runs_df().drop(columns=["sessionID"])
+        run = _prepare_latest_run(df, 5)
+        assert run.latest[2] == 30.0
+        assert run.previous[2] == 20.0
+
+    def test_missing_session_ids_use_fallback(self):
+        df = _make_runs_df()
+        df["sessionID"] = None
+        run = _prepare_latest_run(df, 5)
+        assert run.latest[0] == 300.0
+        assert run.previous[0] == 200.0
+
+    def test_short_log_without_session_id_has_no_previous(self):
+        df = _make_runs_df(sessions=1).drop(columns=["sessionID"]).iloc[:7]
+        run = _prepare_latest_run(df, 5)
+        assert run.previous is None
+        assert run.latest_table.num_rows == 5
+
+    def test_single_run_has_no_previous(self):
+        run = _prepare_latest_run(_make_runs_df(sessions=1), 5)
+        assert run.previous is None
+        assert run.deltas == (None, None, None, None)
+
+    def test_deltas_compare_against_previous_run(self):
+        run = _prepare_latest_run(_make_runs_df(), 5)
+        # download 200 -> 300, upload and jitter missing, latency 20 -> 30
+        assert run.deltas == ("+50.0%", None, "+50.0%", None)
+
+    def test_result_is_frozen(self):
+        run = _prepare_latest_run(_make_runs_df(), 5)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            run.latest = None
+
+
+# ---------------------------------------------------------------------------
+# _session_prepared_run
+# ---------------------------------------------------------------------------
+
+
+class TestSessionPreparedRun:
+    @pytest.fixture(autouse=True)
+    def _session_state(self, monkeypatch):
+        import app.components as components
+
+        monkeypatch.setattr(components.st, "session_state", {}, raising=False)
+
+    def test_reuses_run_for_unchanged_data(self):
+        first = _session_prepared_run(_make_runs_df(), 5)
+        assert _session_prepared_run(_make_runs_df(), 5) is first
+
+    def test_recomputes_when_data_changes(self):
+        first = _session_prepared_run(_make_runs_df(sessions=2), 5)
+        second = _session_prepared_run(_make_runs_df(sessions=3), 5)
+        assert second is not first
+        assert second.latest[0] == 300.0
+
+    def test_recomputes_when_a_file_is_rewritten(self):
+        df = _make_runs_df().assign(source_mtime_ns=1)
+        first = _session_prepared_run(df, 5)
+        rewritten = df.copy()
+        rewritten.loc[rewritten.index[-1], ["download", "source_mtime_ns"]] = [800, 2]
+        second = _session_prepared_run(rewritten, 5)
+        assert second is not first
+        assert second.latest[0] == 400.0
+
+    def test_recomputes_when_run_size_changes(self):
+        first = _session_prepared_run(_make_runs_df(), 5)
+        assert _session_prepared_run(_make_runs_df(), 3) is not first
@@ -2,18 +2,23 @@
 
 import json
 import os
-from datetime import timezone
+from datetime import datetime, timezone
 from pathlib import Path
+from zoneinfo import ZoneInfo
 
 import pandas as pd
 import pytest
 
 # conftest.py stubs streamlit before this import
 from app.data_loader import (
+    _optimize_dtypes,
     aggregate_to_intervals,
+    data_version,
     get_latest_measurements,
+    load_chart_data,
     load_single_file,
     parse_timestamp_from_filename,
+    slice_time_range,
 )
 
 # ---------------------------------------------------------------------------
@@ -187,6 +192,98 @@ class TestLoadSingleFile:
         assert "upload" not in record
 
 
+# ---------------------------------------------------------------------------
+# _optimize_dtypes
+# ---------------------------------------------------------------------------
+
+
+class TestOptimizeDtypes:
+    def _df(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "timestamp": pd.date_range("2024-01-01", periods=3, freq="h"),
+                "endpoint": ["https://a.x.com", "https://b.x.com", "https://a.x.com"],
+                "sessionID": ["s1", "s1", None],
+                "download": [100.5, 200.25, 50.0],
+                "latency": [10.0, None, 12.5],
+                "source_mtime_ns": [1, 2, 3],
+            }
+        )
+
+    def test_metrics_become_float32(self):
+        result = _optimize_dtypes(self._df())
+        assert result["download"].dtype == "float32"
+        assert result["latency"].dtype == "float32"
+        assert result["latency"].isna().sum() == 1
+        assert result["download"].iloc[1] == pytest.approx(200.25)
+
+    def test_endpoint_becomes_categorical(self):
+        result = _optimize_dtypes(self._df())
+        assert isinstance(result["endpoint"].dtype, pd.CategoricalDtype)
+        assert list(result["endpoint"].cat.categories) == [
+            "https://a.x.com",
+            "https://b.x.com",
+        ]
+
+    def test_session_id_becomes_categorical(self):
+        result = _optimize_dtypes(self._df())
+        assert isinstance(result["sessionID"].dtype, pd.CategoricalDtype)
+        assert list(result["sessionID"].cat.categories) == ["s1"]
+        assert result["sessionID"].isna().tolist() == [False, False, True]
+
+    def test_other_columns_untouched(self):
+        df = self._df()
+        result = _optimize_dtypes(df)
+        assert result["source_mtime_ns"].dtype == df["source_mtime_ns"].dtype
+        assert result["timestamp"].dtype == df["timestamp"].dtype
+        # Input frame is not modified
+        assert df["download"].dtype == "float64"
+
+    def test_non_numeric_metric_values_become_nan(self):
+        df = self._df().assign(latency=["10", "n/a", 12.5])
+        result = _optimize_dtypes(df)
+        assert result["latency"].isna().tolist() == [False, True, False]
+
+
+# ---------------------------------------------------------------------------
+# data_version
+# ---------------------------------------------------------------------------
+
+
+class TestDataVersion:
+    def _df(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "timestamp": pd.date_range("2024-01-01", periods=3, freq="h"),
+                "download": [1.0, 2.0, 3.0],
+                "source_mtime_ns": [10, 20, 30],
+            }
+        )
+
+    def test_empty_frame(self):
+        assert data_version(pd.DataFrame()) == (0,)
+
+    def test_equal_for_identical_frames(self):
+        assert data_version(self._df()) == data_version(self._df())
+
+    def test_changes_when_rows_are_added(self):
+        df = self._df()
+        assert data_version(df.iloc[:2]) != data_version(df)
+
+    def test_changes_when_a_file_is_rewritten(self):
+        df = self._df()
+        rewritten = df.assign(download=[1.0, 90.0, 3.0], source_mtime_ns=[10, 25, 30])
+        assert data_version(rewritten) != data_version(df)
+
+    def test_without_mtime_column(self):
+        df = self._df().drop(columns=["source_mtime_ns"])
+        assert data_version(df) == (
+            3,
+            df["timestamp"].iloc[0],
+            df["timestamp"].iloc[-1],
+        )
+
+
 # ---------------------------------------------------------------------------
 # get_latest_measurements
 # ---------------------------------------------------------------------------
@@ -220,6 +317,56 @@ class TestGetLatestMeasurements:
         assert len(result) == 5
 
 
+# ---------------------------------------------------------------------------
+# slice_time_range
+# ---------------------------------------------------------------------------
+
+
+class TestSliceTimeRange:
+    def test_bounds_are_inclusive(self):
+        df = _make_df(10)
+        result = slice_time_range(
+            df, pd.Timestamp("2024-01-01 02:00"), pd.Timestamp("2024-01-01 05:00")
+        )
+        assert list(result["download"]) == [2, 3, 4, 5]
+
+    def test_range_between_measurements(self):
+        df = _make_df(10)
+        result = slice_time_range(
+            df, pd.Timestamp("2024-01-01 02:30"), pd.Timestamp("2024-01-01 04:30")
+        )
+        assert list(result["download"]) == [3, 4]
+
+    def test_range_outside_data_returns_empty(self):
+        df = _make_df(5)
+        result = slice_time_range(
+            df, pd.Timestamp("2025-01-01"), pd.Timestamp("2025-01-02")
+        )
+        assert result.empty
+
+    def test_unsorted_input_is_sorted_first(self):
+        df = _make_df(6).iloc[::-1]
+        result = slice_time_range(
+            df, pd.Timestamp("2024-01-01 01:00"), pd.Timestamp("2024-01-01 03:00")
+        )
+        assert list(result["download"]) == [1, 2, 3]
+
+    def test_tz_aware_bounds(self):
+        df = _make_df(4).assign(
+            timestamp=lambda d: d["timestamp"].dt.tz_localize("Europe/Berlin")
+        )
+        start = datetime(2024, 1, 1, 1, tzinfo=ZoneInfo("Europe/Berlin"))
+        end = datetime(2024, 1, 1, 2, tzinfo=ZoneInfo("Europe/Berlin"))
+        result = slice_time_range(df, start, end)
+        assert list(result["download"]) == [1, 2]
+
+    def test_empty_df_returns_empty(self):
+        result = slice_time_range(
+            pd.DataFrame(), pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-02")
+        )
+        assert result.empty
+
+
 # ---------------------------------------------------------------------------
 # aggregate_to_intervals
 # ---------------------------------------------------------------------------
@@ -283,6 +430,16 @@ class TestAggregateToIntervals:
         assert len(result) == 2
         assert set(result["endpoint"]) == {"ep-a", "ep-b"}
 
+    def test_categorical_endpoint_skips_unobserved_combinations(self):
+        timestamps = ["2024-01-01 10:01", "2024-01-01 10:21"]
+        df = _make_metrics_df(timestamps, [1.0, 2.0], endpoint=["ep-a", "ep-b"])
+        df["endpoint"] = pd.Categorical(
+            df["endpoint"], categories=["ep-a", "ep-b", "ep-c"]
+        )
+        result = aggregate_to_intervals(df, interval_minutes=10)
+        assert len(result) == 2
+        assert list(result["endpoint"]) == ["ep-a", "ep-b"]
+
     def test_only_known_metric_columns_aggregated(self):
         timestamps = ["2024-01-01 10:01"]
         df = _make_metrics_df(timestamps, [100.0], uploads=[50.0])
@@ -300,3 +457,53 @@ class TestAggregateToIntervals:
         result = aggregate_to_intervals(df, interval_minutes=60)
         # 10:00 and 10:30 → same 60-min bucket; 11:00 → next bucket
         assert len(result) == 2
+
+
+# ---------------------------------------------------------------------------
+# load_chart_data
+# ---------------------------------------------------------------------------
+
+
+class TestLoadChartData:
+    START = datetime(2024, 1, 1, 0, 0, tzinfo=timezone.utc)
+    END = datetime(2024, 1, 1, 1, 0, tzinfo=timezone.utc)
+
+    def _df(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "timestamp": pd.date_range(
+                    "2024-01-01 00:00", periods=6, freq="5min", tz="UTC"
+                ),
+                "endpoint": ["https://a.x.com"] * 6,
+                "download": [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+                "source_mtime_ns": [1, 2, 3, 4, 5, 6],
+            }
+        )
+
+    def test_aggregates_range_into_intervals_with_hour(self):
+        result = load_chart_data(self._df(), self.START, self.END)
+        assert result["download"].tolist() == [15.0, 35.0, 55.0]
+        assert result["hour"].tolist() == [0, 0, 0]
+
+    def test_empty_range(self):
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        result = load_chart_data(self._df(), start, start)
+        assert result.empty
+
+    def test_unchanged_data_reuses_cached_result(self, cache_data_memo):
+        cached = cache_data_memo(load_chart_data)
+        first = cached(self._df(), self.START, self.END)
+        assert cached(self._df(), self.START, self.END) is first
+
+    def test_rewritten_file_changes_result_for_same_range(self, cache_data_memo):
+        cached = cache_data_memo(load_chart_data)
+        df = self._df()
+        before = cached(df, self.START, self.END)
+
+        # A file inside the range is rewritten in place: new value, new mtime
+        rewritten = df.copy()
+        rewritten.loc[1, ["download", "source_mtime_ns"]] = [90.0, 7]
+        after = cached(rewritten, self.START, self.END)
+
+        assert before["download"].tolist() == [15.0, 35.0, 55.0]
+        assert after["download"].tolist() == [50.0, 35.0, 55.0]
@@ -0,0 +1,118 @@
+"""Unit tests for app/session_memo.py."""
+
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+
+# conftest.py stubs streamlit before this import
+import app.session_memo as session_memo
+from app.data_loader import data_version, load_chart_data
+from app.session_memo import (
+    LATEST_SUMMARY_KEY,
+    LONGTERM_CHARTS_KEY,
+    SESSION_MEMO_KEYS,
+    clear_session_memos,
+    reuse_for_session,
+)
+
+
+@pytest.fixture(autouse=True)
+def _session_state(monkeypatch):
+    monkeypatch.setattr(session_memo.st, "session_state", {}, raising=False)
+
+
+# ---------------------------------------------------------------------------
+# reuse_for_session
+# ---------------------------------------------------------------------------
+
+
+class TestReuseForSession:
+    def test_builds_once_for_same_fingerprint(self):
+        calls = []
+
+        def build():
+            calls.append(1)
+            return object()
+
+        first = reuse_for_session("key", (1, "a"), build)
+        assert reuse_for_session("key", (1, "a"), build) is first
+        assert len(calls) == 1
+
+    def test_rebuilds_when_fingerprint_changes(self):
+        first = reuse_for_session("key", (1,), object)
+        second = reuse_for_session("key", (2,), object)
+        assert second is not first
+        assert reuse_for_session("key", (2,), object) is second
+
+    def test_keys_are_independent(self):
+        first = reuse_for_session("a", (1,), object)
+        assert reuse_for_session("b", (1,), object) is not first
+
+
+# ---------------------------------------------------------------------------
+# clear_session_memos
+# ---------------------------------------------------------------------------
+
+
+class TestClearSessionMemos:
+    def test_drops_all_memos(self):
+        for key in SESSION_MEMO_KEYS:
+            reuse_for_session(key, (1,), object)
+        clear_session_memos()
+        assert not any(
+            key in session_memo.st.session_state for key in SESSION_MEMO_KEYS
+        )
+
+    def test_keeps_other_session_state(self):
+        session_memo.st.session_state["applied_kpi"] = "download"
+        reuse_for_session(LATEST_SUMMARY_KEY, (1,), object)
+        clear_session_memos()
+        assert session_memo.st.session_state == {"applied_kpi": "download"}
+
+    def test_missing_memos_are_ignored(self):
+        clear_session_memos()
+        assert session_memo.st.session_state == {}
+
+
+# ---------------------------------------------------------------------------
+# chart reuse wired as in app.py
+# ---------------------------------------------------------------------------
+
+
+class TestChartReuseAfterRewrite:
+    START = datetime(2024, 1, 1, 0, 0, tzinfo=timezone.utc)
+    END = datetime(2024, 1, 1, 1, 0, tzinfo=timezone.utc)
+
+    def _df(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "timestamp": pd.date_range(
+                    "2024-01-01 00:00", periods=6, freq="5min", tz="UTC"
+                ),
+                "endpoint": ["https://a.x.com"] * 6,
+                "download": [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+                "source_mtime_ns": [1, 2, 3, 4, 5, 6],
+            }
+        )
+
+    def _render(self, df, chart_data):
+        """Mirror app.py: cached aggregation, then session reuse of the charts."""
+        aggregated = chart_data(df, self.START, self.END)
+        fingerprint = (data_version(df), "download", self.START, self.END)
+        return reuse_for_session(
+            LONGTERM_CHARTS_KEY,
+            fingerprint,
+            lambda: aggregated["download"].tolist(),
+        )
+
+    def test_rewrite_reaches_stored_charts_and_stays(self, cache_data_memo):
+        chart_data = cache_data_memo(load_chart_data)
+        df = self._df()
+        assert self._render(df, chart_data) == [15.0, 35.0, 55.0]
+
+        rewritten = df.copy()
+        rewritten.loc[1, ["download", "source_mtime_ns"]] = [90.0, 7]
+        assert self._render(rewritten, chart_data) == [50.0, 35.0, 55.0]
+        # Later reruns with the same data keep the fresh charts
+        assert self._render(rewritten, chart_data) == [50.0, 35.0, 55.0]